@@ -1,10 +1,21 @@
+import hashlib
 import mimetypes
+import os
+import re
 import shutil
-from typing import Annotated, Any, List, Optional
-
-from fastapi import APIRouter, Depends, Header, HTTPException
+import stat
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Annotated, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
 from starlette import status
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
 
 from app import schemas
 from app.command import Command
@@ -19,108 +30,272 @@ from app.log import logger
 from app.scheduler import Scheduler
 from app.schemas.types import SystemConfigKey
 
-PROTECTED_ROUTES = {"/api/v1/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc"}
+
+class PluginRouteIndex(BaseRoute):
+    """
+    插件路由索引，按路径分段构建前缀树，插件 API 请求只需匹配同路径的候选路由，
+    未命中时交由 Starlette 按顺序匹配（处理 405、尾部斜杠重定向等情况）
+    """
+
+    # 静态路径查找结果缓存容量
+    CACHE_SIZE = 1024
+
+    class _Node:
+        __slots__ = ("children", "param", "routes", "tail")
+
+        def __init__(self):
+            # 静态分段子节点
+            self.children: Dict[str, "PluginRouteIndex._Node"] = {}
+            # 路径参数分段子节点
+            self.param: Optional["PluginRouteIndex._Node"] = None
+            # 在此节点结束的路由 (注册顺序, 路由)
+            self.routes: List[Tuple[int, BaseRoute]] = []
+            # 含 path 转换器、可匹配剩余任意路径的路由
+            self.tail: List[Tuple[int, BaseRoute]] = []
+
+    def __init__(self, prefix: str):
+        self.path = prefix
+        self.prefix = f"{prefix}/"
+        # (前缀树根节点, 静态路径 -> 候选路由缓存)，重建时整体替换，避免查找中途读到新旧混合的状态
+        self._state: Tuple[PluginRouteIndex._Node, OrderedDict[str, List[BaseRoute]]] = (
+            self._Node(), OrderedDict()
+        )
+
+    def rebuild(self, routes: Iterable[BaseRoute]):
+        """
+        根据插件路由重建前缀树
+        :param routes: 按注册顺序排列的插件路由
+        """
+        root = self._Node()
+        for order, route in enumerate(routes):
+            node = root
+            for segment in route.path.split("/"):
+                if "{" not in segment:
+                    node = node.children.setdefault(sys.intern(segment), self._Node())
+                elif ":path}" in segment:
+                    node.tail.append((order, route))
+                    break
+                else:
+                    if node.param is None:
+                        node.param = self._Node()
+                    node = node.param
+            else:
+                node.routes.append((order, route))
+        self._state = (root, OrderedDict())
+
+    def lookup(self, path: str) -> List[BaseRoute]:
+        """
+        查找可能匹配路径的候选路由，按注册顺序返回
+        """
+        # 只读取一次状态，重建后的结果不会写入新缓存
+        root, cache = self._state
+        cached = cache.get(path)
+        if cached is not None:
+            cache.move_to_end(path)
+            return cached
+        segments = path.split("/")
+        total = len(segments)
+        found = []
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            found.extend(node.tail)
+            if depth == total:
+                found.extend(node.routes)
+                continue
+            if node.param is not None:
+                stack.append((node.param, depth + 1))
+            child = node.children.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+        found.sort(key=lambda item: item[0])
+        routes = [route for _, route in found]
+        # 只缓存不含路径参数的结果，避免缓存随参数取值无限增长
+        if routes and not any(getattr(route, "param_convertors", None) for route in routes):
+            cache[path] = routes
+            if len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+        return routes
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            return Match.NONE, {}
+        for route in self.lookup(scope["path"]):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return Match.FULL, {**child_scope, "route": route}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send):
+        await scope["route"].handle(scope, receive, send)
+
+    def url_path_for(self, name: str, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+
 PLUGIN_PREFIX = f"{settings.API_V1_STR}/plugin"
+# 非法静态文件路径：".." 路径段、绝对路径、Windows 盘符及反斜杠
+UNSAFE_PATH_PATTERN = re.compile(r"(?:^|/)\.\.(?:/|$)|^/|^[A-Za-z]:|\\")
+# 插件目录
+PLUGIN_DIR = settings.ROOT_PATH / "app" / "plugins"
+# 插件静态文件常用 MIME 类型，未列出的再通过 mimetypes 猜测
+STATIC_MIME_TYPES = {
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".css": "text/css",
+    ".html": "text/html",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+}
+# 插件 API 鉴权依赖，所有插件路由共用同一对象
+_TOKEN_DEPENDENCY = Depends(verify_token)
+_APIKEY_DEPENDENCY = Depends(verify_apikey)
+# 插件 ID 到其已注册路由的索引
+_PLUGIN_ROUTES: Dict[str, List[BaseRoute]] = defaultdict(list)
+# 插件路由前缀树索引
+_PLUGIN_ROUTE_INDEX = PluginRouteIndex(PLUGIN_PREFIX)
+# 插件路由变更锁，安装、重载、卸载等接口可能在多个线程中同时变更插件路由
+_PLUGIN_ROUTES_LOCK = threading.Lock()
 
 router = APIRouter()
 
 
-def register_plugin_api(plugin_id: Optional[str] = None):
+def register_plugin_api(plugin_id: Optional[Union[str, List[str]]] = None):
     """
     动态注册插件 API
-    :param plugin_id: 插件 ID，如果为 None，则注册所有插件
+    :param plugin_id: 插件 ID 或插件 ID 列表，如果为 None，则注册所有插件；传入列表时批量注册，仅重建一次路由
     """
     _update_plugin_api_routes(plugin_id, action="add")
 
 
-def remove_plugin_api(plugin_id: str):
+def remove_plugin_api(plugin_id: Union[str, List[str]]):
     """
-    动态移除单个插件的 API
-    :param plugin_id: 插件 ID
+    动态移除插件的 API
+    :param plugin_id: 插件 ID 或插件 ID 列表
     """
     _update_plugin_api_routes(plugin_id, action="remove")
 
 
-def _update_plugin_api_routes(plugin_id: Optional[str], action: str):
+def _update_plugin_api_routes(plugin_id: Optional[Union[str, List[str]]], action: str):
     """
-    插件 API 路由注册和移除
-    :param plugin_id: 插件 ID，如果 action 为 "add" 且 plugin_id 为 None，则处理所有插件
-                      如果 action 为 "remove"，plugin_id 必须是有效的插件 ID
+    插件 API 路由注册和移除，先规划所有插件的路由增删，再统一应用并只重建一次 OpenAPI
+    :param plugin_id: 插件 ID 或插件 ID 列表，如果为 None，则处理所有运行中的插件；空列表不做任何处理
     :param action: "add" 或 "remove"，决定是添加还是移除路由
     """
     if action not in {"add", "remove"}:
         raise ValueError("Action must be 'add' or 'remove'")
 
-    is_modified = False
-    existing_paths = {route.path: route for route in app.routes}
-
-    plugin_ids = [plugin_id] if plugin_id else PluginManager().get_running_plugin_ids()
+    if plugin_id is None:
+        plugin_ids = PluginManager().get_running_plugin_ids()
+    elif isinstance(plugin_id, str):
+        plugin_ids = [plugin_id]
+    else:
+        plugin_ids = list(plugin_id)
+    # 插件 ID 作为路由索引等字典的键，驻留后哈希和比较更快
+    plugin_ids = [sys.intern(pid) for pid in plugin_ids if pid]
+
+    with _PLUGIN_ROUTES_LOCK:
+        # 规划阶段：收集需要移除和添加的路由
+        routes_to_remove, apis_to_add = _plan_plugin_api_routes(plugin_ids, action)
+        # 应用阶段：统一移除和添加路由
+        is_removed = _remove_routes(routes_to_remove)
+        for pid in plugin_ids:
+            _PLUGIN_ROUTES.pop(pid, None)
+        is_added = _add_routes(apis_to_add)
+        if is_removed or is_added:
+            _PLUGIN_ROUTE_INDEX.rebuild(route for routes in _PLUGIN_ROUTES.values() for route in routes)
+            # 文档路由不受插件路由变更影响，无需 app.setup()，只需让 OpenAPI 在下次访问时重新生成
+            app.openapi_schema = None
+
+
+def _plan_plugin_api_routes(plugin_ids: List[str], action: str) -> Tuple[List[BaseRoute], List[Tuple[str, dict]]]:
+    """
+    规划插件路由的变更，不修改应用路由
+    :param plugin_ids: 插件 ID 列表
+    :param action: "add" 或 "remove"
+    :return: 需要移除的路由列表，需要添加的 (插件 ID, API 参数) 列表
+    """
+    plugin_manager = PluginManager()
+    routes_to_remove = []
+    apis_to_add = []
     for plugin_id in plugin_ids:
-        routes_removed = _remove_routes(plugin_id)
-        if routes_removed:
-            is_modified = True
+        routes_to_remove.extend(_PLUGIN_ROUTES.get(plugin_id, []))
 
         if action != "add":
             continue
         # 获取插件的 API 路由信息
-        plugin_apis = PluginManager().get_plugin_apis(plugin_id)
+        plugin_apis = plugin_manager.get_plugin_apis(plugin_id)
         for api in plugin_apis:
             api_path = f"{PLUGIN_PREFIX}{api.get('path', '')}"
             try:
                 api["path"] = api_path
                 allow_anonymous = api.pop("allow_anonymous", False)
                 auth_mode = api.pop("auth", "apikey")
-                dependencies = api.setdefault("dependencies", [])
+                dependencies = api.get("dependencies") or []
                 if not allow_anonymous:
-                    if auth_mode == "bear" and Depends(verify_token) not in dependencies:
-                        dependencies.append(Depends(verify_token))
-                    elif Depends(verify_apikey) not in dependencies:
-                        dependencies.append(Depends(verify_apikey))
-                app.add_api_route(**api, tags=["plugin"])
-                is_modified = True
-                logger.debug(f"Added plugin route: {api_path}")
+                    auth_dependency = _TOKEN_DEPENDENCY if auth_mode == "bear" else _APIKEY_DEPENDENCY
+                    # 插件通常不自带依赖，此时无需查重；Depends 未实现 __eq__，需按其包装的依赖函数判断
+                    if not dependencies or not any(getattr(dep, "dependency", None) is auth_dependency.dependency
+                                                   for dep in dependencies):
+                        dependencies = [*dependencies, auth_dependency]
+                api["dependencies"] = dependencies
+                apis_to_add.append((plugin_id, api))
             except Exception as e:
-                logger.error(f"Error adding plugin route {api_path}: {str(e)}")
+                logger.error(f"Error preparing plugin route {api_path}: {str(e)}")
+    return routes_to_remove, apis_to_add
 
-    if is_modified:
-        _clean_protected_routes(existing_paths)
-        app.openapi_schema = None
-        app.setup()
 
-
-def _remove_routes(plugin_id: str) -> bool:
+def _add_routes(apis: List[Tuple[str, dict]]) -> bool:
     """
-    移除与单个插件相关的路由
-    :param plugin_id: 插件 ID
-    :return: 是否有路由被移除
+    添加插件路由，需在 _PLUGIN_ROUTES_LOCK 内调用
+    :param apis: (插件 ID, API 参数) 列表
+    :return: 是否有路由被添加
     """
-    if not plugin_id:
+    if not apis:
         return False
-    prefix = f"{PLUGIN_PREFIX}/{plugin_id}/"
-    routes_to_remove = [route for route in app.routes if route.path.startswith(prefix)]
-    removed = False
-    for route in routes_to_remove:
+    # 索引需位于所有插件路由之前
+    if not any(route is _PLUGIN_ROUTE_INDEX for route in app.router.routes):
+        app.router.routes.append(_PLUGIN_ROUTE_INDEX)
+    added = False
+    for plugin_id, api in apis:
+        api_path = api.get("path")
         try:
-            app.routes.remove(route)
-            removed = True
-            logger.debug(f"Removed plugin route: {route.path}")
+            app.add_api_route(**api, tags=["plugin"])
+            # 持有锁时刚添加的路由即为最后一个路由
+            _PLUGIN_ROUTES[plugin_id].append(app.router.routes[-1])
+            added = True
+            logger.debug(f"Added plugin route: {api_path}")
         except Exception as e:
-            logger.error(f"Error removing plugin route {route.path}: {str(e)}")
-    return removed
+            logger.error(f"Error adding plugin route {api_path}: {str(e)}")
+    return added
 
 
-def _clean_protected_routes(existing_paths: dict):
+def _remove_routes(routes: List[BaseRoute]) -> bool:
     """
-    清理受保护的路由，防止在插件操作中被删除或重复添加
-    :param existing_paths: 当前应用的路由路径映射
+    移除插件相关的路由，需在 _PLUGIN_ROUTES_LOCK 内调用
+    :param routes: 需要移除的路由列表
+    :return: 是否有路由被移除
     """
-    for protected_route in PROTECTED_ROUTES:
-        try:
-            existing_route = existing_paths.get(protected_route)
-            if existing_route:
-                app.routes.remove(existing_route)
-        except Exception as e:
-            logger.error(f"Error removing protected route {protected_route}: {str(e)}")
+    if not routes:
+        return False
+    # 一次遍历过滤掉所有待移除路由，避免逐个 list.remove
+    to_remove = {id(route) for route in routes}
+    remaining = [route for route in app.router.routes if id(route) not in to_remove]
+    removed = len(remaining) != len(app.router.routes)
+    app.router.routes[:] = remaining
+    for route in routes:
+        logger.debug(f"Removed plugin route: {route.path}")
+    return removed
 
 
 def register_plugin(plugin_id: str):
@@ -137,21 +312,42 @@ def register_plugin(plugin_id: str):
 
 @router.get("/", summary="所有插件", response_model=List[schemas.Plugin])
 def all_plugins(_: schemas.TokenPayload = Depends(get_current_active_superuser),
-                state: Optional[str] = "all", force: bool = False) -> List[schemas.Plugin]:
+                state: Optional[str] = "all", force: bool = False,
+                if_none_match: Annotated[str | None, Header()] = None) -> Any:
     """
     查询所有插件清单，包括本地插件和在线插件，插件状态：installed, market, all
+    插件清单未变化时（If-None-Match 与 ETag 一致）返回 304
+    """
+    plugins = _get_plugins_by_state(state, force)
+    response = JSONResponse(content=jsonable_encoder(plugins))
+    etag = hashlib.md5(response.body, usedforsecurity=False).hexdigest()
+    if _etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": f'"{etag}"'})
+    response.headers["ETag"] = f'"{etag}"'
+    return response
+
+
+def _get_plugins_by_state(state: Optional[str], force: bool) -> List[schemas.Plugin]:
     """
+    按插件状态查询插件清单
+    :param state: 插件状态：installed, market, all
+    :param force: 是否强制刷新在线插件
+    """
+    plugin_manager = PluginManager()
     # 本地插件
-    local_plugins = PluginManager().get_local_plugins()
-    # 已安装插件
-    installed_plugins = [plugin for plugin in local_plugins if plugin.installed]
+    local_plugins = plugin_manager.get_local_plugins()
+    # 已安装插件、未安装的本地插件
+    installed_plugins, not_installed_plugins = [], []
+    for plugin in local_plugins:
+        if plugin.installed:
+            installed_plugins.append(plugin)
+        else:
+            not_installed_plugins.append(plugin)
     if state == "installed":
         return installed_plugins
-        
-    # 未安装的本地插件
-    not_installed_plugins = [plugin for plugin in local_plugins if not plugin.installed]
+
     # 在线插件
-    online_plugins = PluginManager().get_online_plugins(force)
+    online_plugins = plugin_manager.get_online_plugins(force)
     if not online_plugins:
         # 没有获取在线插件
         if state == "market":
@@ -161,24 +357,24 @@ def all_plugins(_: schemas.TokenPayload = Depends(get_current_active_superuser),
 
     # 插件市场插件清单
     market_plugins = []
+    # 插件市场插件IDS
+    market_ids = set()
     # 已安装插件IDS
-    _installed_ids = [plugin.id for plugin in installed_plugins]
+    installed_ids = {plugin.id for plugin in installed_plugins}
     # 未安装的线上插件或者有更新的插件
     for plugin in online_plugins:
-        if plugin.id not in _installed_ids:
-            market_plugins.append(plugin)
-        elif plugin.has_update:
+        if plugin.id not in installed_ids or plugin.has_update:
             market_plugins.append(plugin)
+            market_ids.add(plugin.id)
     # 未安装的本地插件，且不在线上插件中
-    _plugin_ids = [plugin.id for plugin in market_plugins]
     for plugin in not_installed_plugins:
-        if plugin.id not in _plugin_ids:
+        if plugin.id not in market_ids:
             market_plugins.append(plugin)
     # 返回插件清单
     if state == "market":
         # 返回未安装的插件
         return market_plugins
-        
+
     # 返回所有插件
     return installed_plugins + market_plugins
 
@@ -219,10 +415,11 @@ def install(plugin_id: str,
     """
     安装插件
     """
+    config_oper = SystemConfigOper()
     # 已安装插件
-    install_plugins = SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or []
+    install_plugins = config_oper.get(SystemConfigKey.UserInstalledPlugins) or []
     # 首先检查插件是否已经存在，并且是否强制安装，否则只进行安装统计
-    if not force and plugin_id in PluginManager().get_plugin_ids():
+    if not force and plugin_id in PluginManager().plugins:
         PluginHelper().install_reg(pid=plugin_id)
     else:
         # 插件不存在或需要强制安装，下载安装并注册插件
@@ -238,7 +435,7 @@ def install(plugin_id: str,
     if plugin_id not in install_plugins:
         install_plugins.append(plugin_id)
         # 保存设置
-        SystemConfigOper().set(SystemConfigKey.UserInstalledPlugins, install_plugins)
+        config_oper.set(SystemConfigKey.UserInstalledPlugins, install_plugins)
     # 重新加载插件
     reload_plugin(plugin_id)
     return schemas.Response(success=True)
@@ -260,24 +457,36 @@ def plugin_form(plugin_id: str,
     """
     根据插件ID获取插件配置表单或Vue组件URL
     """
-    plugin_instance = PluginManager().running_plugins.get(plugin_id)
+    plugin_manager = PluginManager()
+    plugin_instance = plugin_manager.running_plugins.get(plugin_id)
     if not plugin_instance:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"插件 {plugin_id} 不存在或未加载")
 
     # 渲染模式
-    render_mode, _ = plugin_instance.get_render_mode()
+    render_mode = plugin_instance.cached_render_mode[0]
     try:
         conf, model = plugin_instance.get_form()
         return {
             "render_mode": render_mode,
             "conf": conf,
-            "model": PluginManager().get_plugin_config(plugin_id) or model
+            "model": plugin_manager.get_plugin_config(plugin_id) or model
         }
     except Exception as e:
         logger.error(f"插件 {plugin_id} 调用方法 get_form 出错: {str(e)}")
     return {}
 
 
+def _etag_matches(etag: Optional[str], if_none_match: Optional[str]) -> bool:
+    """
+    判断请求头 If-None-Match 是否包含指定的 ETag
+    :param etag: 不带引号的 ETag
+    :param if_none_match: 请求头 If-None-Match 的值
+    """
+    if not etag or not if_none_match:
+        return False
+    return etag in {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+
+
 @router.get("/page/{plugin_id}", summary="获取插件数据页面")
 def plugin_page(plugin_id: str, _: schemas.TokenPayload = Depends(get_current_active_superuser)) -> dict:
     """
@@ -288,7 +497,7 @@ def plugin_page(plugin_id: str, _: schemas.TokenPayload = Depends(get_current_ac
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"插件 {plugin_id} 不存在或未加载")
 
     # 渲染模式
-    render_mode, _ = plugin_instance.get_render_mode()
+    render_mode = plugin_instance.cached_render_mode[0]
     try:
         page = plugin_instance.get_page()
         return {
@@ -343,35 +552,41 @@ def reset_plugin(plugin_id: str,
 
 
 @router.get("/file/{plugin_id}/{filepath:path}", summary="获取插件静态文件")
-def plugin_static_file(plugin_id: str, filepath: str):
+def plugin_static_file(plugin_id: str, filepath: str,
+                       if_none_match: Annotated[str | None, Header()] = None):
     """
-    获取插件静态文件
+    获取插件静态文件，支持 ETag 协商缓存
     """
     # 基础安全检查
-    if ".." in filepath or ".." in plugin_id:
+    if UNSAFE_PATH_PATTERN.search(filepath) or UNSAFE_PATH_PATTERN.search(plugin_id):
         logger.warning(f"Static File API: Path traversal attempt detected: {plugin_id}/{filepath}")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
-    plugin_base_dir = settings.ROOT_PATH / "app" / "plugins" / plugin_id.lower()
-    plugin_file_path = plugin_base_dir / filepath
-    if not plugin_file_path.exists():
+    plugin_file_path = PLUGIN_DIR / plugin_id.lower() / filepath
+    # 只 stat 一次，同时判断是否存在及是否为文件
+    try:
+        stat_result = os.stat(plugin_file_path)
+    except (OSError, ValueError):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{plugin_file_path} 不存在")
-    if not plugin_file_path.is_file():
+    if not stat.S_ISREG(stat_result.st_mode):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"{plugin_file_path} 不是文件")
 
-    # 判断 MIME 类型
-    response_type, _ = mimetypes.guess_type(str(plugin_file_path))
-    suffix = plugin_file_path.suffix.lower()
-    # 强制修正 .mjs 和 .js 的 MIME 类型
-    if suffix in ['.js', '.mjs']:
-        response_type = 'application/javascript'
-    elif suffix == '.css' and not response_type:  # 如果 guess_type 没猜对 css，也修正
-        response_type = 'text/css'
-    elif not response_type:  # 对于其他猜不出的类型
-        response_type = 'application/octet-stream'
+    # 判断 MIME 类型，常用类型直接查表，其他类型再猜测
+    response_type = (STATIC_MIME_TYPES.get(plugin_file_path.suffix.lower())
+                     or mimetypes.guess_type(str(plugin_file_path), strict=False)[0]
+                     or "application/octet-stream")
 
     try:
-        return FileResponse(plugin_file_path, media_type=response_type)
+        # 复用已获取的文件状态，避免 FileResponse 再次 stat
+        response = FileResponse(plugin_file_path, media_type=response_type,
+                                stat_result=stat_result,
+                                headers={"Cache-Control": "no-cache"})
+        etag = response.headers.get("etag")
+        if _etag_matches(etag, if_none_match):
+            # 文件未变更，浏览器直接使用本地缓存
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers={"ETag": etag, "Cache-Control": "no-cache"})
+        return response
     except Exception as e:
         logger.error(f"Error creating/sending FileResponse for {plugin_file_path}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -383,8 +598,7 @@ def get_plugin_folders(_: schemas.TokenPayload = Depends(get_current_active_supe
     获取插件文件夹分组配置
     """
     try:
-        result = SystemConfigOper().get(SystemConfigKey.PluginFolders) or {}
-        return result
+        return _load_folders()
     except Exception as e:
         logger.error(f"[文件夹API] 获取文件夹配置失败: {str(e)}")
         return {}
@@ -396,7 +610,7 @@ def save_plugin_folders(folders: dict, _: schemas.TokenPayload = Depends(get_cur
     保存插件文件夹分组配置
     """
     try:
-        SystemConfigOper().set(SystemConfigKey.PluginFolders, folders)
+        _save_folders(_normalize_folders(folders))
         return schemas.Response(success=True)
     except Exception as e:
         logger.error(f"[文件夹API] 保存文件夹配置失败: {str(e)}")
@@ -408,10 +622,10 @@ def create_plugin_folder(folder_name: str, _: schemas.TokenPayload = Depends(get
     """
     创建新的插件文件夹
     """
-    folders = SystemConfigOper().get(SystemConfigKey.PluginFolders) or {}
+    folders = _load_folders()
     if folder_name not in folders:
-        folders[folder_name] = []
-        SystemConfigOper().set(SystemConfigKey.PluginFolders, folders)
+        folders[folder_name] = {"plugins": []}
+        _save_folders(folders)
         return schemas.Response(success=True, message=f"文件夹 '{folder_name}' 创建成功")
     else:
         return schemas.Response(success=False, message=f"文件夹 '{folder_name}' 已存在")
@@ -422,10 +636,10 @@ def delete_plugin_folder(folder_name: str, _: schemas.TokenPayload = Depends(get
     """
     删除插件文件夹
     """
-    folders = SystemConfigOper().get(SystemConfigKey.PluginFolders) or {}
+    folders = _load_folders()
     if folder_name in folders:
         del folders[folder_name]
-        SystemConfigOper().set(SystemConfigKey.PluginFolders, folders)
+        _save_folders(folders)
         return schemas.Response(success=True, message=f"文件夹 '{folder_name}' 删除成功")
     else:
         return schemas.Response(success=False, message=f"文件夹 '{folder_name}' 不存在")
@@ -436,9 +650,9 @@ def update_folder_plugins(folder_name: str, plugin_ids: List[str], _: schemas.To
     """
     更新指定文件夹中的插件列表
     """
-    folders = SystemConfigOper().get(SystemConfigKey.PluginFolders) or {}
-    folders[folder_name] = plugin_ids
-    SystemConfigOper().set(SystemConfigKey.PluginFolders, folders)
+    folders = _load_folders()
+    folders.setdefault(folder_name, {})["plugins"] = plugin_ids
+    _save_folders(folders)
     return schemas.Response(success=True, message=f"文件夹 '{folder_name}' 中的插件已更新")
 
 
@@ -468,19 +682,21 @@ def set_plugin_config(plugin_id: str, conf: dict,
 
 
 @router.delete("/{plugin_id}", summary="卸载插件", response_model=schemas.Response)
-def uninstall_plugin(plugin_id: str,
+def uninstall_plugin(plugin_id: str, background_tasks: BackgroundTasks,
                      _: schemas.TokenPayload = Depends(get_current_active_superuser)) -> Any:
     """
     卸载插件
     """
     config_oper = SystemConfigOper()
-    # 删除已安装信息
-    install_plugins = config_oper.get(SystemConfigKey.UserInstalledPlugins) or []
-    for plugin in install_plugins:
-        if plugin == plugin_id:
-            install_plugins.remove(plugin)
-            break
-    config_oper.set(SystemConfigKey.UserInstalledPlugins, install_plugins)
+    # 已安装信息和文件夹配置合并为一次数据库写入
+    with config_oper.batch():
+        # 删除已安装信息
+        install_plugins = config_oper.get(SystemConfigKey.UserInstalledPlugins) or []
+        remaining_plugins = [plugin for plugin in install_plugins if plugin != plugin_id]
+        if len(remaining_plugins) != len(install_plugins):
+            config_oper.set(SystemConfigKey.UserInstalledPlugins, remaining_plugins)
+        # 从插件文件夹中移除该插件
+        _remove_plugin_from_folders(plugin_id)
     # 移除插件API
     remove_plugin_api(plugin_id)
     # 移除插件服务
@@ -492,21 +708,27 @@ def uninstall_plugin(plugin_id: str,
         # 如果是分身插件，则删除分身数据和配置
         plugin_manager.delete_plugin_config(plugin_id)
         plugin_manager.delete_plugin_data(plugin_id)
-        # 删除分身文件
-        plugin_base_dir = settings.ROOT_PATH / "app" / "plugins" / plugin_id.lower()
+        # 删除分身文件，目录可能较大，响应后在后台删除
+        plugin_base_dir = PLUGIN_DIR / plugin_id.lower()
         if plugin_base_dir.exists():
-            try:
-                shutil.rmtree(plugin_base_dir)
-                plugin_manager.plugins.pop(plugin_id, None)
-            except Exception as e:
-                logger.error(f"删除插件分身目录 {plugin_base_dir} 失败: {str(e)}")
-    # 从插件文件夹中移除该插件
-    _remove_plugin_from_folders(plugin_id)
+            plugin_manager.plugins.pop(plugin_id, None)
+            background_tasks.add_task(_remove_plugin_dir, plugin_base_dir)
     # 移除插件
     plugin_manager.remove_plugin(plugin_id)
     return schemas.Response(success=True)
 
 
+def _remove_plugin_dir(plugin_dir: Path):
+    """
+    删除插件目录
+    :param plugin_dir: 插件目录
+    """
+    try:
+        shutil.rmtree(plugin_dir)
+    except Exception as e:
+        logger.error(f"删除插件分身目录 {plugin_dir} 失败: {str(e)}")
+
+
 @router.post("/clone/{plugin_id}", summary="创建插件分身", response_model=schemas.Response)
 def clone_plugin(plugin_id: str,
                  clone_data: dict,
@@ -544,43 +766,21 @@ def _add_clone_to_plugin_folder(original_plugin_id: str, clone_plugin_id: str):
     :param clone_plugin_id: 分身插件ID
     """
     try:
-        config_oper = SystemConfigOper()
-        # 获取插件文件夹配置
-        folders = config_oper.get(SystemConfigKey.PluginFolders) or {}
-        
+        folders = _load_folders()
         # 查找原插件所在的文件夹
-        target_folder = None
-        for folder_name, folder_data in folders.items():
-            if isinstance(folder_data, dict) and 'plugins' in folder_data:
-                # 新格式：{"plugins": [...], "order": ..., "icon": ...}
-                if original_plugin_id in folder_data['plugins']:
-                    target_folder = folder_name
-                    break
-            elif isinstance(folder_data, list):
-                # 旧格式：直接是插件列表
-                if original_plugin_id in folder_data:
-                    target_folder = folder_name
-                    break
-        
+        target_folders = _get_plugin_folder_index(folders).get(original_plugin_id)
         # 如果找到了原插件所在的文件夹，则将分身插件也添加到该文件夹中
-        if target_folder:
-            folder_data = folders[target_folder]
-            if isinstance(folder_data, dict) and 'plugins' in folder_data:
-                # 新格式
-                if clone_plugin_id not in folder_data['plugins']:
-                    folder_data['plugins'].append(clone_plugin_id)
-                    logger.info(f"已将分身插件 {clone_plugin_id} 添加到文件夹 '{target_folder}' 中")
-            elif isinstance(folder_data, list):
-                # 旧格式
-                if clone_plugin_id not in folder_data:
-                    folder_data.append(clone_plugin_id)
-                    logger.info(f"已将分身插件 {clone_plugin_id} 添加到文件夹 '{target_folder}' 中")
-            
+        if target_folders:
+            target_folder = target_folders[0]
+            folder_plugins = folders[target_folder]["plugins"]
+            if clone_plugin_id not in folder_plugins:
+                folder_plugins.append(clone_plugin_id)
+                logger.info(f"已将分身插件 {clone_plugin_id} 添加到文件夹 '{target_folder}' 中")
             # 保存更新后的文件夹配置
-            config_oper.set(SystemConfigKey.PluginFolders, folders)
+            _save_folders(folders)
         else:
             logger.info(f"原插件 {original_plugin_id} 不在任何文件夹中，分身插件 {clone_plugin_id} 将保持独立")
-            
+
     except Exception as e:
         logger.error(f"处理插件文件夹时出错：{str(e)}")
         # 文件夹处理失败不影响插件分身创建的整体流程
@@ -592,34 +792,64 @@ def _remove_plugin_from_folders(plugin_id: str):
     :param plugin_id: 要移除的插件ID
     """
     try:
-        config_oper = SystemConfigOper()
-        # 获取插件文件夹配置
-        folders = config_oper.get(SystemConfigKey.PluginFolders) or {}
-        
-        # 标记是否有修改
-        modified = False
-        
-        # 遍历所有文件夹，移除指定插件
-        for folder_name, folder_data in folders.items():
-            if isinstance(folder_data, dict) and 'plugins' in folder_data:
-                # 新格式：{"plugins": [...], "order": ..., "icon": ...}
-                if plugin_id in folder_data['plugins']:
-                    folder_data['plugins'].remove(plugin_id)
-                    logger.info(f"已从文件夹 '{folder_name}' 中移除插件 {plugin_id}")
-                    modified = True
-            elif isinstance(folder_data, list):
-                # 旧格式：直接是插件列表
-                if plugin_id in folder_data:
-                    folder_data.remove(plugin_id)
-                    logger.info(f"已从文件夹 '{folder_name}' 中移除插件 {plugin_id}")
-                    modified = True
-        
-        # 如果有修改，保存更新后的文件夹配置
-        if modified:
-            config_oper.set(SystemConfigKey.PluginFolders, folders)
-        else:
+        folders = _load_folders()
+        # 通过反向索引定位插件所在的文件夹
+        folder_names = _get_plugin_folder_index(folders).get(plugin_id)
+        if not folder_names:
             logger.debug(f"插件 {plugin_id} 不在任何文件夹中，无需移除")
-            
+            return
+        for folder_name in folder_names:
+            folders[folder_name]["plugins"].remove(plugin_id)
+            logger.info(f"已从文件夹 '{folder_name}' 中移除插件 {plugin_id}")
+        # 保存更新后的文件夹配置
+        _save_folders(folders)
+
     except Exception as e:
         logger.error(f"从文件夹中移除插件时出错：{str(e)}")
         # 文件夹处理失败不影响插件卸载的整体流程
+
+
+def _normalize_folders(folders: Optional[dict]) -> Dict[str, dict]:
+    """
+    将插件文件夹配置统一为新格式：{"文件夹": {"plugins": [...], "order": ..., "icon": ...}}
+    旧格式（文件夹直接对应插件列表）会被转换为新格式
+    :param folders: 原始文件夹配置
+    :return: 新格式的文件夹配置
+    """
+    normalized = {}
+    for folder_name, folder_data in (folders or {}).items():
+        if isinstance(folder_data, dict):
+            folder_data.setdefault("plugins", [])
+            normalized[folder_name] = folder_data
+        elif isinstance(folder_data, list):
+            normalized[folder_name] = {"plugins": folder_data}
+        else:
+            normalized[folder_name] = {"plugins": []}
+    return normalized
+
+
+def _load_folders() -> Dict[str, dict]:
+    """
+    读取插件文件夹配置，并统一为新格式
+    """
+    return _normalize_folders(SystemConfigOper().get(SystemConfigKey.PluginFolders))
+
+
+def _save_folders(folders: Dict[str, dict]):
+    """
+    保存插件文件夹配置
+    :param folders: 新格式的文件夹配置
+    """
+    SystemConfigOper().set(SystemConfigKey.PluginFolders, folders)
+
+
+def _get_plugin_folder_index(folders: Dict[str, dict]) -> Dict[str, List[str]]:
+    """
+    根据当前文件夹配置构建插件 ID 到所在文件夹名称的反向索引
+    :param folders: 当前新格式的文件夹配置
+    """
+    index = defaultdict(list)
+    for folder_name, folder_data in folders.items():
+        for pid in folder_data["plugins"]:
+            index[pid].append(folder_name)
+    return index
@@ -74,9 +74,7 @@ class ChainBase(metaclass=ABCMeta):
         """
         删除本地缓存
         """
-        cache_path = settings.TEMP_PATH / filename
-        if cache_path.exists():
-            cache_path.unlink()
+        (settings.TEMP_PATH / filename).unlink(missing_ok=True)
 
     def run_module(self, method: str, *args, **kwargs) -> Any:
         """
@@ -1,8 +1,14 @@
 import json
-import re
+import os
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Union, Optional
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from packaging.version import InvalidVersion, Version
 
 from app.chain import ChainBase
 from app.core.config import settings
@@ -13,6 +19,36 @@ from app.utils.system import SystemUtils
 from app.helper.system import SystemHelper
 from version import FRONTEND_VERSION, APP_VERSION
 
+# Github版本发布信息缓存：{url: (过期时间, ETag, 版本标签列表)}
+_release_cache: Dict[str, Tuple[float, Optional[str], List[str]]] = {}
+_release_cache_lock = threading.Lock()
+
+# 本进程内已确认存在的目录
+_ensured_dirs: Set[str] = set()
+
+
+def _ensure_dir(path: Union[str, Path]) -> None:
+    """
+    确保目录存在，同一目录在进程内只创建一次
+    :param path: 目录路径
+    """
+    path = str(path)
+    if path in _ensured_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    _ensured_dirs.add(path)
+
+
+def _parse_version(tag: str) -> Optional[Version]:
+    """
+    解析版本标签，无法解析时返回None
+    :param tag: 版本标签，如v2.1.0
+    """
+    try:
+        return Version(tag.lstrip("v"))
+    except InvalidVersion:
+        return None
+
 
 class SystemChain(ChainBase):
     """
@@ -50,6 +86,33 @@ class SystemChain(ChainBase):
         # 重启
         SystemHelper.restart()
 
+    @staticmethod
+    def __backup_plugin(entry: os.DirEntry, backup_dir: Path) -> bool:
+        """
+        备份单个插件目录或文件
+        :param entry: 插件目录下的条目
+        :param backup_dir: 备份目录
+        :return: 是否进行了备份
+        """
+        target_path = os.path.join(backup_dir, entry.name)
+
+        # 如果是目录，已备份过的由copytree抛出FileExistsError跳过
+        if entry.is_dir():
+            try:
+                shutil.copytree(entry.path, target_path, copy_function=shutil.copy)
+            except FileExistsError:
+                return False
+            logger.info(f"已备份插件目录: {entry.name}")
+            return True
+        # 如果是文件
+        elif entry.is_file():
+            if os.path.lexists(target_path):
+                return False
+            shutil.copy(entry.path, target_path)
+            logger.info(f"已备份插件文件: {entry.name}")
+            return True
+        return False
+
     @staticmethod
     def backup_plugins():
         """
@@ -69,37 +132,61 @@ class SystemChain(ChainBase):
                 logger.info("插件目录不存在，跳过备份")
                 return
 
-            # 确保备份目录存在
-            backup_dir.mkdir(parents=True, exist_ok=True)
+            # 确保备份目录存在，需在提交多线程任务前完成
+            _ensure_dir(backup_dir)
 
             # 需要排除的文件和目录
             exclude_items = {"__init__.py", "__pycache__", ".DS_Store"}
 
-            # 遍历插件目录，备份除排除项外的所有内容
-            for item in plugins_dir.iterdir():
-                if item.name in exclude_items:
-                    continue
-
-                target_path = backup_dir / item.name
-
-                # 如果是目录
-                if item.is_dir():
-                    if target_path.exists():
-                        continue
-                    shutil.copytree(item, target_path)
-                    logger.info(f"已备份插件目录: {item.name}")
-                # 如果是文件
-                elif item.is_file():
-                    if target_path.exists():
-                        continue
-                    shutil.copy2(item, target_path)
-                    logger.info(f"已备份插件文件: {item.name}")
+            # 遍历插件目录，备份除排除项外的所有内容，类型判断复用scandir返回的信息
+            with os.scandir(plugins_dir) as it:
+                entries = [entry for entry in it if entry.name not in exclude_items]
+
+            if entries:
+                # 各插件互不相关，多线程并行复制
+                with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+                    all_task = {
+                        executor.submit(SystemChain.__backup_plugin, entry, backup_dir): entry.name
+                        for entry in entries
+                    }
+                    for future in as_completed(all_task):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error(f"备份插件 {all_task[future]} 时发生错误: {str(e)}")
 
             logger.info(f"插件备份完成，备份位置: {backup_dir}")
 
         except Exception as e:
             logger.error(f"插件备份失败: {str(e)}")
 
+    @staticmethod
+    def __restore_plugin(entry: os.DirEntry, plugins_dir: Path) -> bool:
+        """
+        恢复单个插件目录或文件
+        :param entry: 备份目录下的条目
+        :param plugins_dir: 插件目录
+        :return: 是否进行了恢复
+        """
+        target_path = os.path.join(plugins_dir, entry.name)
+        # 如果是目录
+        if entry.is_dir():
+            # 目录内无内容时跳过，只读取第一个条目判断
+            with os.scandir(entry.path) as it:
+                if next(it, None) is None:
+                    return False
+            if os.path.lexists(target_path):
+                shutil.rmtree(target_path)
+            shutil.copytree(entry.path, target_path, copy_function=shutil.copy)
+            logger.info(f"已恢复插件目录: {entry.name}")
+            return True
+        # 如果是文件
+        elif entry.is_file():
+            shutil.copy(entry.path, target_path)
+            logger.info(f"已恢复插件文件: {entry.name}")
+            return True
+        return False
+
     @staticmethod
     def restore_plugins():
         """
@@ -122,34 +209,31 @@ class SystemChain(ChainBase):
         if SystemHelper().is_system_reset():
 
             # 确保插件目录存在
-            plugins_dir.mkdir(parents=True, exist_ok=True)
+            _ensure_dir(plugins_dir)
 
-            # 遍历备份目录，恢复所有内容
+            # 遍历备份目录，多线程恢复所有内容，类型判断复用scandir返回的信息
             restored_count = 0
-            for item in backup_dir.iterdir():
-                target_path = plugins_dir / item.name
-                try:
-                    # 如果是目录，且目录内有内容
-                    if item.is_dir() and any(item.iterdir()):
-                        if target_path.exists():
-                            shutil.rmtree(target_path)
-                        shutil.copytree(item, target_path)
-                        logger.info(f"已恢复插件目录: {item.name}")
-                        restored_count += 1
-                    # 如果是文件
-                    elif item.is_file():
-                        shutil.copy2(item, target_path)
-                        logger.info(f"已恢复插件文件: {item.name}")
-                        restored_count += 1
-                except Exception as e:
-                    logger.error(f"恢复插件 {item.name} 时发生错误: {str(e)}")
-                    continue
+            with os.scandir(backup_dir) as it:
+                entries = list(it)
+            if entries:
+                with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+                    all_task = {
+                        executor.submit(SystemChain.__restore_plugin, entry, plugins_dir): entry.name
+                        for entry in entries
+                    }
+                    for future in as_completed(all_task):
+                        try:
+                            if future.result():
+                                restored_count += 1
+                        except Exception as e:
+                            logger.error(f"恢复插件 {all_task[future]} 时发生错误: {str(e)}")
 
             logger.info(f"插件恢复完成，共恢复 {restored_count} 个项目")
 
         # 删除备份目录
         try:
             shutil.rmtree(backup_dir)
+            _ensured_dirs.discard(str(backup_dir))
             logger.info(f"已删除插件备份目录: {backup_dir}")
         except Exception as e:
             logger.warning(f"删除备份目录失败: {str(e)}")
@@ -158,8 +242,12 @@ class SystemChain(ChainBase):
         """
         获取版本信息文本
         """
-        server_release_version = self.__get_server_release_version()
-        front_release_version = self.__get_front_release_version()
+        # 前后端远程版本互不依赖，并行查询
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            server_task = executor.submit(self.__get_server_release_version)
+            front_task = executor.submit(self.__get_front_release_version)
+            server_release_version = server_task.result()
+            front_release_version = front_task.result()
         server_local_version = self.get_server_local_version()
         front_local_version = self.get_frontend_version()
         if server_release_version == server_local_version:
@@ -185,77 +273,104 @@ class SystemChain(ChainBase):
         如通过交互命令重启，
         重启完发送msg
         """
-        # 重启消息
+        # 重启消息，load_cache在缓存文件不存在时直接返回None
         restart_channel = self.load_cache(self._restart_file)
-        if restart_channel:
-            # 发送重启完成msg
-            if not isinstance(restart_channel, dict):
-                restart_channel = json.loads(restart_channel)
-            channel = next(
-                (channel for channel in MessageChannel.__members__.values() if
-                 channel.value == restart_channel.get('channel')), None)
-            userid = restart_channel.get('userid')
-
-            # 版本号
-            title = self.__get_version_message()
-            self.post_message(Notification(channel=channel,
-                                           title=f"系统已重启完成！\n{title}",
-                                           userid=userid))
+        if not restart_channel:
+            return
+        # restart中始终以字典保存，其它内容视为无效缓存
+        if not isinstance(restart_channel, dict):
             self.remove_cache(self._restart_file)
+            return
+        # 发送重启完成msg
+        try:
+            channel = MessageChannel(restart_channel.get('channel'))
+        except ValueError:
+            channel = None
+        userid = restart_channel.get('userid')
+
+        # 版本号
+        title = self.__get_version_message()
+        self.post_message(Notification(channel=channel,
+                                       title=f"系统已重启完成！\n{title}",
+                                       userid=userid))
+        self.remove_cache(self._restart_file)
 
     @staticmethod
-    def __get_server_release_version():
+    def __get_release_tags(url: str) -> Optional[List[str]]:
         """
-        获取后端V2最新版本
+        获取Github仓库发布的版本标签列表，缓存有效期内直接返回，过期后通过ETag重新验证，
+        请求失败时返回上一次成功获取的结果
+        :param url: Github releases API地址
+        """
+        with _release_cache_lock:
+            cached = _release_cache.get(url)
+        if cached and time.monotonic() < cached[0]:
+            return cached[2]
+        headers = dict(settings.GITHUB_HEADERS)
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+        response = RequestUtils(
+            proxies=settings.PROXY,
+            headers=headers,
+            timeout=5
+        ).get_res(url)
+        if response is None:
+            return cached[2] if cached else None
+        expires_at = time.monotonic() + settings.GITHUB_RELEASE_CACHE_TTL
+        if response.status_code == 304 and cached:
+            # 未变化，沿用缓存内容并延长有效期
+            tags = cached[2]
+            etag = cached[1]
+        elif response.ok:
+            # 直接解析原始字节，只保留版本标签
+            tags = [release['tag_name'] for release in json.loads(response.content)]
+            etag = response.headers.get("ETag")
+        else:
+            return cached[2] if cached else None
+        with _release_cache_lock:
+            _release_cache[url] = (expires_at, etag, tags)
+        return tags
+
+    @staticmethod
+    def __get_latest_v2(url: str, name: str) -> Optional[str]:
+        """
+        获取Github仓库V2最新版本
+        :param url: Github releases API地址
+        :param name: 日志中显示的名称，如后端、前端
         """
         try:
             # 获取所有发布的版本列表
-            response = RequestUtils(
-                proxies=settings.PROXY,
-                headers=settings.GITHUB_HEADERS
-            ).get_res("https://api.github.com/repos/jxxghp/MoviePilot/releases")
-            if response:
-                releases = [release['tag_name'] for release in response.json()]
-                v2_releases = [tag for tag in releases if re.match(r"^v2\.", tag)]
-                if not v2_releases:
-                    logger.warn("获取v2后端最新版本版本出错！")
+            releases = SystemChain.__get_release_tags(url)
+            if releases is not None:
+                # 一次遍历找到最新的v2版本，每个标签只解析一次，忽略无法解析的标签
+                latest = max(((version, tag) for tag in releases
+                              if tag.startswith("v2.") and (version := _parse_version(tag)) is not None),
+                             default=None)
+                if not latest:
+                    logger.warn(f"获取v2{name}最新版本版本出错！")
                 else:
-                    # 找到最新的v2版本
-                    latest_v2 = sorted(v2_releases, key=lambda s: list(map(int, re.findall(r'\d+', s))))[-1]
-                    logger.info(f"获取到后端最新版本：{latest_v2}")
+                    latest_v2 = latest[1]
+                    logger.info(f"获取到{name}最新版本：{latest_v2}")
                     return latest_v2
             else:
-                logger.error("无法获取后端版本信息，请检查网络连接或GitHub API请求。")
+                logger.error(f"无法获取{name}版本信息，请检查网络连接或GitHub API请求。")
         except Exception as err:
-            logger.error(f"获取后端最新版本失败：{str(err)}")
+            logger.error(f"获取{name}最新版本失败：{str(err)}")
         return None
 
+    @staticmethod
+    def __get_server_release_version():
+        """
+        获取后端V2最新版本
+        """
+        return SystemChain.__get_latest_v2("https://api.github.com/repos/jxxghp/MoviePilot/releases", "后端")
+
     @staticmethod
     def __get_front_release_version():
         """
         获取前端V2最新版本
         """
-        try:
-            # 获取所有发布的版本列表
-            response = RequestUtils(
-                proxies=settings.PROXY,
-                headers=settings.GITHUB_HEADERS
-            ).get_res("https://api.github.com/repos/jxxghp/MoviePilot-Frontend/releases")
-            if response:
-                releases = [release['tag_name'] for release in response.json()]
-                v2_releases = [tag for tag in releases if re.match(r"^v2\.", tag)]
-                if not v2_releases:
-                    logger.warn("获取v2前端最新版本版本出错！")
-                else:
-                    # 找到最新的v2版本
-                    latest_v2 = sorted(v2_releases, key=lambda s: list(map(int, re.findall(r'\d+', s))))[-1]
-                    logger.info(f"获取到前端最新版本：{latest_v2}")
-                    return latest_v2
-            else:
-                logger.error("无法获取前端版本信息，请检查网络连接或GitHub API请求。")
-        except Exception as err:
-            logger.error(f"获取前端最新版本失败：{str(err)}")
-        return None
+        return SystemChain.__get_latest_v2("https://api.github.com/repos/jxxghp/MoviePilot-Frontend/releases", "前端")
 
     @staticmethod
     def get_server_local_version():
@@ -265,9 +380,10 @@ class SystemChain(ChainBase):
         return APP_VERSION
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_frontend_version():
         """
-        获取前端版本
+        获取前端版本，前端只在重启时更新，进程内缓存读取结果
         """
         if SystemUtils.is_frozen() and SystemUtils.is_windows():
             version_file = settings.CONFIG_PATH.parent / "nginx" / "html" / "version.txt"
@@ -275,9 +391,7 @@ class SystemChain(ChainBase):
             version_file = Path(settings.FRONTEND_PATH) / "version.txt"
         if version_file.exists():
             try:
-                with open(version_file, 'r') as f:
-                    version = str(f.read()).strip()
-                return version
+                return version_file.read_text().strip()
             except Exception as err:
                 logger.debug(f"加载版本文件 {version_file} 出错：{str(err)}")
         return FRONTEND_VERSION
@@ -248,6 +248,8 @@ class ConfigModel(BaseModel):
     PIP_PROXY: Optional[str] = ''
     # 指定的仓库Github token，多个仓库使用,分隔，格式：{user1}/{repo1}:ghp_****,{user2}/{repo2}:github_pat_****
     REPO_GITHUB_TOKEN: Optional[str] = None
+    # Github版本发布信息缓存时间（秒）
+    GITHUB_RELEASE_CACHE_TTL: int = 1800
     # 大内存模式
     BIG_MEMORY_MODE: bool = False
     # 是否启用内存监控
@@ -123,7 +123,7 @@ class PluginManager(metaclass=Singleton):
             return True
 
         # 已安装插件
-        installed_plugins = SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or []
+        installed_plugins = set(SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or [])
         # 扫描插件目录
         if pid:
             # 加载指定插件
@@ -176,6 +176,8 @@ class PluginManager(metaclass=Singleton):
         plugin = self._running_plugins.get(plugin_id)
         if not plugin:
             return
+        # 清除缓存的渲染模式
+        plugin.__dict__.pop("cached_render_mode", None)
         # 初始化插件
         plugin.init_plugin(conf)
         # 检查插件状态并启用/禁用事件处理器
@@ -344,7 +346,7 @@ class PluginManager(metaclass=Singleton):
             return []
 
         # 获取已安装插件列表
-        install_plugins = SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or []
+        install_plugins = set(SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or [])
         # 获取在线插件列表
         online_plugins = self.get_online_plugins()
         # 确定需要安装的插件
@@ -625,7 +627,7 @@ class PluginManager(metaclass=Singleton):
             if pid and pid != plugin_id:
                 continue
             if hasattr(plugin, "get_render_mode"):
-                render_mode, dist_path = plugin.get_render_mode()
+                render_mode, dist_path = plugin.cached_render_mode
                 if render_mode != "vue":
                     continue
                 remotes.append({
@@ -685,7 +687,7 @@ class PluginManager(metaclass=Singleton):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"插件 {pid} 不存在或未加载")
 
         # 渲染模式
-        render_mode, _ = plugin_instance.get_render_mode()
+        render_mode, _ = plugin_instance.cached_render_mode
         # 获取插件仪表板
         try:
             # 检查方法的参数个数
@@ -819,7 +821,7 @@ class PluginManager(metaclass=Singleton):
         # 返回值
         plugins = []
         # 已安装插件
-        installed_apps = SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or []
+        installed_apps = set(SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or [])
         for pid, plugin_class in self._plugins.items():
             # 运行状插件
             plugin_obj = self._running_plugins.get(pid)
@@ -930,7 +932,7 @@ class PluginManager(metaclass=Singleton):
         if not market:
             return []
         # 已安装插件
-        installed_apps = SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or []
+        installed_apps = set(SystemConfigOper().get(SystemConfigKey.UserInstalledPlugins) or [])
         # 获取在线插件
         online_plugins = PluginHelper().get_plugins(market, package_version, force)
         if online_plugins is None:
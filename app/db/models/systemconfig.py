@@ -19,6 +19,22 @@ class SystemConfig(Base):
     def get_by_key(db: Session, key: str):
         return db.query(SystemConfig).filter(SystemConfig.key == key).first()
 
+    @classmethod
+    @db_update
+    def bulk_set(cls, db: Session, items: dict):
+        """
+        在同一事务中批量写入配置，值为空时删除已有配置
+        """
+        for key, value in items.items():
+            conf = db.query(cls).filter(cls.key == key).first()
+            if conf:
+                if value:
+                    conf.value = value
+                else:
+                    db.delete(conf)
+            else:
+                db.add(cls(key=key, value=value))
+
     @db_update
     def delete_by_key(self, db: Session, key: str):
         systemconfig = self.get_by_key(db, key)
@@ -1,5 +1,7 @@
 import copy
-from typing import Any, Optional, Union
+import threading
+from contextlib import contextmanager
+from typing import Any, Generator, Optional, Set, Union
 
 from app.db import DbOper
 from app.db.models.systemconfig import SystemConfig
@@ -17,6 +19,8 @@ class SystemConfigOper(DbOper, metaclass=Singleton):
         """
         super().__init__()
         self.__SYSTEMCONF = {}
+        # 各线程批量设置中待写入数据库的配置键，pending_keys 为 None 时表示当前线程不在批量设置中
+        self.__batch_local = threading.local()
         for item in SystemConfig.list(self._db):
             self.__SYSTEMCONF[item.key] = item.value
 
@@ -33,6 +37,13 @@ class SystemConfigOper(DbOper, metaclass=Singleton):
         old_value = self.__SYSTEMCONF.get(key)
         # 更新内存(deepcopy避免内存共享)
         self.__SYSTEMCONF[key] = copy.deepcopy(value)
+        pending_keys = self.__get_pending_keys()
+        if pending_keys is not None:
+            # 当前线程在批量设置中，退出时统一写入数据库
+            if old_value == value:
+                return None
+            pending_keys.add(key)
+            return True
         conf = SystemConfig.get_by_key(self._db, key)
         if conf:
             if old_value != value:
@@ -47,6 +58,30 @@ class SystemConfigOper(DbOper, metaclass=Singleton):
             conf.create(self._db)
             return True
 
+    @contextmanager
+    def batch(self) -> Generator["SystemConfigOper", None, None]:
+        """
+        批量设置系统设置，上下文中当前线程的 set 只更新内存，退出时在同一事务中写入数据库
+        其它线程的 set 不受影响，仍然直接写入数据库
+        """
+        if self.__get_pending_keys() is not None:
+            # 已在批量设置中，合并到外层统一写入
+            yield self
+            return
+        pending_keys = self.__batch_local.pending_keys = set()
+        try:
+            yield self
+        finally:
+            self.__batch_local.pending_keys = None
+            if pending_keys:
+                SystemConfig.bulk_set(self._db, {key: self.__SYSTEMCONF.get(key) for key in pending_keys})
+
+    def __get_pending_keys(self) -> Optional[Set[str]]:
+        """
+        获取当前线程批量设置中待写入数据库的配置键
+        """
+        return getattr(self.__batch_local, "pending_keys", None)
+
     def get(self, key: Union[str, SystemConfigKey] = None) -> Any:
         """
         获取系统设置
@@ -1,4 +1,5 @@
 from abc import ABCMeta, abstractmethod
+from functools import cached_property
 from pathlib import Path
 from typing import Any, List, Dict, Tuple, Optional
 
@@ -93,6 +94,13 @@ class _PluginBase(metaclass=ABCMeta):
         """
         return "vuetify", None
 
+    @cached_property
+    def cached_render_mode(self) -> Tuple[str, Optional[str]]:
+        """
+        获取插件渲染模式，首次调用 get_render_mode 后缓存，插件重新初始化时失效
+        """
+        return self.get_render_mode()
+
     @abstractmethod
     def get_api(self) -> List[Dict[str, Any]]:
         """
@@ -7,6 +7,7 @@ import shutil
 import subprocess
 import sys
 import uuid
+from functools import lru_cache
 from glob import glob
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
@@ -55,6 +56,7 @@ class SystemUtils:
             return False, error_message
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def is_docker() -> bool:
         """
         判断是否为Docker环境
@@ -71,6 +73,7 @@ class SystemUtils:
         return True if "synology" in SystemUtils.execute('uname -a') else False
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def is_windows() -> bool:
         """
         判断是否为Windows系统
@@ -78,6 +81,7 @@ class SystemUtils:
         return True if os.name == "nt" else False
 
     @staticmethod
+    @lru_cache(maxsize=1)
     def is_frozen() -> bool:
         """
         判断是否为冻结的二进制文件